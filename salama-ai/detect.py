@@ -1,56 +1,90 @@
 #!/usr/bin/env python3
+import json
 import os
+import time
 import requests
-import cv2
-import numpy as np
 from ultralytics import YOLO
 
+from outbox import AlertOutbox
+from sampler import CameraSampler
+
 # Configuration
 BASE_URL = "http://localhost:8000/api/v1"
-CAMERAS_URL = f"{BASE_URL}/cameras/"
-SNAPSHOT_URL = f"{BASE_URL}/cameras/{{camera_id}}/snapshot"
+CONFIG_URL = f"{BASE_URL}/config/"
 ALERTS_URL = f"{BASE_URL}/alerts/"
+OUTBOX_PATH = os.getenv("SALAMA_OUTBOX_PATH", "alerts_outbox.db")
+OUTBOX_DRAIN_TIMEOUT = float(os.getenv("SALAMA_OUTBOX_DRAIN_TIMEOUT", "10"))
+# Camera list and config version kept between polls and runs, so each poll only fetches what changed
+CONFIG_CACHE_PATH = os.getenv("SALAMA_CONFIG_CACHE_PATH", "config_cache.json")
+CONFIG_REFRESH_SECONDS = float(os.getenv("SALAMA_CONFIG_REFRESH_SECONDS", "10"))
+# Frames sampled per second from each camera's stream, and the width they are scaled down to
+SAMPLE_FPS = float(os.getenv("SALAMA_SAMPLE_FPS", "2"))
+DETECT_WIDTH = int(os.getenv("SALAMA_DETECT_WIDTH", "640"))
+# Limit on connecting to a camera and on waiting for each frame
+CAMERA_TIMEOUT_MS = int(os.getenv("SALAMA_CAMERA_TIMEOUT_MS", "2000"))
 
-def get_cameras():
-    """Fetch list of cameras from backend"""
-    print("🔍 Fetching camera list from backend...")
+def load_config_cache():
+    """Camera list and config version saved by the previous run"""
     try:
-        response = requests.get(CAMERAS_URL)
-        response.raise_for_status()
-        cameras = response.json()
-        print(f"✅ Found {len(cameras)} cameras")
-        return cameras
-    except requests.RequestException as e:
-        print(f"❌ Error fetching cameras: {e}")
-        return []
+        with open(CONFIG_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"version": None, "cameras": {}}
 
-def get_camera_snapshot(camera_id):
-    """Fetch snapshot for a specific camera"""
-    print(f"📸 Getting snapshot for camera ID: {camera_id}")
+def save_config_cache(cache):
+    tmp_path = f"{CONFIG_CACHE_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, CONFIG_CACHE_PATH)
+
+def get_cameras():
+    """Fetch cameras changed since the last poll from backend and return the full list, or None if it cannot be reached"""
+    print("🔍 Fetching camera changes from backend...")
+    cache = load_config_cache()
     try:
-        response = requests.get(SNAPSHOT_URL.format(camera_id=camera_id), stream=True)
+        params = {}
+        if cache["version"] is not None:
+            params["since_version"] = cache["version"]
+        response = requests.get(CONFIG_URL, params=params)
         response.raise_for_status()
-        
-        # Save snapshot temporarily
-        with open('snapshot.jpg', 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        print("✅ Snapshot saved successfully")
-        return 'snapshot.jpg'
+        changes = response.json()
     except requests.RequestException as e:
-        print(f"❌ Error fetching snapshot for camera {camera_id}: {e}")
+        print(f"❌ Error fetching cameras: {e}")
         return None
 
-def detect_objects(image_path):
+    # JSON object keys are strings
+    cameras = {} if changes["full"] else cache["cameras"]
+    for camera in changes["cameras"]:
+        cameras[str(camera["id"])] = camera
+    for camera_id in changes["removed_cameras"]:
+        cameras.pop(str(camera_id), None)
+    save_config_cache({"version": changes["version"], "cameras": cameras})
+
+    print(f"✅ Found {len(cameras)} cameras ({len(changes['cameras'])} changed)")
+    return [cameras[camera_id] for camera_id in sorted(cameras, key=int)]
+
+def stream_url(camera):
+    """Detection reads the low-resolution substream when the camera has one"""
+    return camera.get("substream_url") or camera["rtsp_url"]
+
+def sync_samplers(samplers, cameras):
+    """Keep one open, sampled stream per camera, reopening those whose URL changed"""
+    wanted = {camera["id"]: stream_url(camera) for camera in cameras}
+    for camera_id in list(samplers):
+        if wanted.get(camera_id) != samplers[camera_id].url:
+            samplers.pop(camera_id).stop()
+    for camera_id, url in wanted.items():
+        if camera_id not in samplers:
+            sampler = CameraSampler(url, sample_fps=SAMPLE_FPS, max_width=DETECT_WIDTH, timeout_ms=CAMERA_TIMEOUT_MS)
+            sampler.start()
+            samplers[camera_id] = sampler
+
+def detect_objects(model, frame):
     """Perform YOLO object detection"""
     print("🤖 Starting YOLO object detection...")
     try:
-        # Load pre-trained YOLOv8 model
-        model = YOLO('yolov8n.pt')  # You can change to a different model if needed
-        
         # Run inference
-        results = model(image_path)
+        results = model(frame, verbose=False)
         
         # Filter for specific objects (e.g., person, car, bottle)
         detected_objects = [
@@ -69,62 +103,79 @@ def detect_objects(image_path):
         print(f"❌ Detection error: {e}")
         return []
 
-def send_alert(camera_id, objects):
-    """Send alert to backend if objects detected"""
+def send_alert(outbox, camera_id, objects, observed_at):
+    """Queue an alert for the backend if objects detected"""
     if not objects:
         return
     
-    print("📡 Sending alert to backend...")
-    try:
-        alert_data = {
-            "camera_id": camera_id,
-            "type": "object_detection",
-            "severity": "medium",
-            "message": f"Objects detected: {', '.join(objects)}",
-            "object_detected": objects[0] if objects else None,
-            "confidence_score": "0.7",  # Example confidence score
-            "additional_metadata": {
-                "total_objects": len(objects),
-                "detection_method": "YOLO"
-            }
+    alert_data = {
+        "camera_id": camera_id,
+        # Time of the snapshot, so a delayed delivery keeps the time of the event
+        "created_at": observed_at.isoformat(),
+        "type": "object_detection",
+        "severity": "medium",
+        "message": f"Objects detected: {', '.join(objects)}",
+        "object_detected": objects[0] if objects else None,
+        "confidence_score": "0.7",  # Example confidence score
+        "additional_metadata": {
+            "total_objects": len(objects),
+            "detection_method": "YOLO"
         }
+    }
+    
+    # Delivery happens in the background, so a slow or unavailable backend never blocks detection
+    outbox.put(alert_data)
+    print("📡 Alert queued for delivery")
+
+def detect_cameras(outbox, model, samplers, last_seen):
+    """Run detection on the newest sampled frame of each camera and queue alerts"""
+    for camera_id, sampler in samplers.items():
+        sample = sampler.latest()
+        # Only detect on frames that have not been looked at yet
+        if sample is None or sample[0] == last_seen.get(camera_id):
+            continue
+        observed_at, frame = sample
+        last_seen[camera_id] = observed_at
+        print(f"📹 Processing camera {camera_id} frame from {observed_at:%H:%M:%S.%f}")
         
-        response = requests.post(ALERTS_URL, json=alert_data)
-        response.raise_for_status()
-        print("✅ Alert sent successfully")
-    except requests.RequestException as e:
-        print(f"❌ Error sending alert: {response.text}")
-        print(f"Error details: {e}")
+        # Detect objects
+        detected_objects = detect_objects(model, frame)
+        
+        # Send alert if objects detected
+        send_alert(outbox, camera_id, detected_objects, observed_at)
 
 def main():
     print("🚀 Starting Salama AI Detection Script")
     
-    # Get list of cameras
-    cameras = get_cameras()
-    
-    if not cameras:
-        print("❌ No cameras found. Exiting.")
-        return
-    
-    # Process first camera (you can modify to process all cameras)
-    camera = cameras[0]
-    camera_id = camera['id']
-    print(f"📹 Processing camera: {camera}")
-    
-    # Fetch snapshot
-    snapshot_path = get_camera_snapshot(camera_id)
-    if not snapshot_path:
-        return
-    
-    # Detect objects
-    detected_objects = detect_objects(snapshot_path)
-    
-    # Send alert if objects detected
-    send_alert(camera_id, detected_objects)
-    
-    # Clean up temporary snapshot
-    if os.path.exists(snapshot_path):
-        os.remove(snapshot_path)
+    # Load pre-trained YOLOv8 model once; you can change to a different model if needed
+    model = YOLO('yolov8n.pt')
+    # Start delivering alerts, including any left over from a previous run
+    outbox = AlertOutbox(OUTBOX_PATH, ALERTS_URL)
+    outbox.start()
+    samplers = {}
+    last_seen = {}
+    synced_at = None
+    try:
+        while True:
+            if synced_at is None or time.monotonic() - synced_at >= CONFIG_REFRESH_SECONDS:
+                synced_at = time.monotonic()
+                cameras = get_cameras()
+                # Keep the current streams while the backend cannot be reached
+                if cameras is not None:
+                    if not cameras:
+                        print("❌ No cameras found. Waiting for cameras to be added.")
+                    # Process first camera (you can modify to process all cameras)
+                    sync_samplers(samplers, cameras[:1])
+            detect_cameras(outbox, model, samplers, last_seen)
+            time.sleep(1.0 / SAMPLE_FPS)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for sampler in samplers.values():
+            sampler.stop()
+        pending = outbox.close(drain_timeout=OUTBOX_DRAIN_TIMEOUT)
+        if pending:
+            print(f"📦 {pending} alerts kept in outbox for the next run")
     
     print("🏁 Detection script completed")
 
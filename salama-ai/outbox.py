@@ -0,0 +1,176 @@
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class AlertOutbox:
+    """
+    Durable store-and-forward queue for alerts.
+
+    Alerts are appended to a local SQLite database in WAL mode, which is a cheap
+    local write, so detection never waits on the backend. A background thread
+    reads due alerts in batches and posts them one at a time over a keep-alive
+    HTTP session, retrying failed deliveries with exponential backoff. Undelivered
+    alerts survive restarts.
+
+    Delivery is at least once: an alert whose response was lost is sent again.
+    Each alert is given an ``event_id`` when it is queued, which the backend uses
+    to store it only once.
+    """
+
+    def __init__(self, path, alerts_url, batch_size=50, base_backoff=1.0, max_backoff=300.0, timeout=5.0):
+        self.path = path
+        self.alerts_url = alerts_url
+        self.batch_size = batch_size
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self._conn = self._connect()
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                dead INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_outbox_due ON outbox (dead, next_attempt_at)")
+        self._conn.commit()
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def put(self, alert_data):
+        """Append an alert to the outbox and wake the sender."""
+        # Stays the same across redeliveries, so the backend can drop duplicates
+        alert_data = {"event_id": str(uuid.uuid4()), **alert_data}
+        self._conn.execute("INSERT INTO outbox (payload) VALUES (?)", (json.dumps(alert_data),))
+        self._conn.commit()
+        self._wake.set()
+
+    def pending(self):
+        """Number of alerts still waiting for delivery."""
+        return self._conn.execute("SELECT COUNT(*) FROM outbox WHERE dead = 0").fetchone()[0]
+
+    def start(self):
+        """Start the background sender thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alert-outbox", daemon=True)
+            self._thread.start()
+
+    def close(self, drain_timeout=10.0):
+        """
+        Give the sender up to ``drain_timeout`` seconds to deliver what is queued, then stop it.
+        Anything left stays in the outbox for the next run; returns how many alerts that is.
+        """
+        deadline = time.monotonic() + drain_timeout
+        while self._thread and self.pending() and time.monotonic() < deadline:
+            self._wake.set()
+            time.sleep(0.1)
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        remaining = self.pending()
+        self._conn.close()
+        return remaining
+
+    def _backoff(self, attempts):
+        # attempts keeps growing across runs during a long outage; cap the exponent
+        delay = min(self.base_backoff * (2 ** min(attempts, 16)), self.max_backoff)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _run(self):
+        conn = self._connect()
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        try:
+            while not self._stop.is_set():
+                try:
+                    self._step(conn, session)
+                except Exception as e:
+                    # Never let an unexpected sqlite or requests error stop delivery for good
+                    print(f"⚠️ Alert outbox error ({e}), retrying in {self.base_backoff:.1f}s")
+                    self._stop.wait(self.base_backoff)
+        finally:
+            session.close()
+            conn.close()
+
+    def _step(self, conn, session):
+        """Deliver what is due, then wait for the next alert, retry or backoff."""
+        sent, backoff = self._drain_batch(conn, session)
+        if backoff:
+            # The backend is failing; hold off the whole outbox, not just one alert
+            self._stop.wait(backoff)
+        elif not sent:
+            # Nothing due: sleep until a new alert arrives or a retry is due
+            row = conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE dead = 0"
+            ).fetchone()
+            wait = self.max_backoff if row[0] is None else max(row[0] - time.time(), 0.05)
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def _drain_batch(self, conn, session):
+        """
+        Try to deliver one batch of due alerts, one POST per alert.
+        Returns how many were delivered and, if the backend failed, how long to back off.
+        """
+        rows = conn.execute(
+            "SELECT id, payload, attempts FROM outbox "
+            "WHERE dead = 0 AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+            (time.time(), self.batch_size),
+        ).fetchall()
+
+        sent = 0
+        for row_id, payload, attempts in rows:
+            if self._stop.is_set():
+                break
+            try:
+                response = session.post(self.alerts_url, data=payload,
+                                        headers={"Content-Type": "application/json"},
+                                        timeout=self.timeout)
+            except requests.RequestException as e:
+                return sent, self._retry_later(conn, row_id, attempts, str(e))
+
+            if response.ok:
+                conn.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+                conn.commit()
+                sent += 1
+            elif 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+                # The backend rejected the alert itself; keep it, but stop retrying
+                print(f"❌ Alert {row_id} rejected by backend: {response.text}")
+                conn.execute("UPDATE outbox SET dead = 1, last_error = ? WHERE id = ?",
+                             (response.text, row_id))
+                conn.commit()
+            else:
+                return sent, self._retry_later(conn, row_id, attempts, f"HTTP {response.status_code}")
+        return sent, 0
+
+    def _retry_later(self, conn, row_id, attempts, error):
+        delay = self._backoff(attempts)
+        print(f"⚠️ Alert {row_id} delivery failed ({error}), retrying in {delay:.1f}s")
+        conn.execute(
+            "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?",
+            (time.time() + delay, error, row_id),
+        )
+        conn.commit()
+        return delay
@@ -0,0 +1,89 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import cv2
+
+
+def open_stream(url, timeout_ms):
+    """Open a camera stream with FFmpeg, with connect and read bounded by ``timeout_ms``."""
+    return cv2.VideoCapture(url, cv2.CAP_FFMPEG, [
+        cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+        cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms,
+    ])
+
+
+def downscale(frame, max_width):
+    """Shrink a frame to at most ``max_width`` pixels wide, keeping its aspect ratio."""
+    if not max_width or frame.shape[1] <= max_width:
+        return frame
+    height = round(frame.shape[0] * max_width / frame.shape[1])
+    return cv2.resize(frame, (max_width, height), interpolation=cv2.INTER_AREA)
+
+
+class CameraSampler:
+    """
+    Keeps one camera stream open and samples it at ``sample_fps`` on a background thread.
+
+    Every frame is pulled off the stream with ``grab()`` so the buffer never goes
+    stale, but only frames that are due are ``retrieve()``d, which is where OpenCV
+    converts the picture to a BGR image. The latest sampled frame, scaled down to
+    ``max_width``, is kept for detection. Connecting and waiting for a frame are each
+    bounded by ``timeout_ms``; a dropped stream is reopened after ``retry_seconds``.
+    """
+
+    def __init__(self, url, sample_fps=2.0, max_width=640, timeout_ms=2000, retry_seconds=5.0):
+        self.url = url
+        self.interval = 1.0 / sample_fps
+        self.max_width = max_width
+        self.timeout_ms = timeout_ms
+        self.retry_seconds = retry_seconds
+
+        self._latest = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def latest(self):
+        """``(observed_at, frame)`` of the most recent sample, or None while the stream is down."""
+        with self._lock:
+            return self._latest
+
+    def _run(self):
+        while not self._stop.is_set():
+            cap = open_stream(self.url, self.timeout_ms)
+            try:
+                if cap.isOpened():
+                    # Keep as little as possible queued so sampled frames are current
+                    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                    self._sample(cap)
+                else:
+                    print(f"❌ Failed to connect to camera stream {self.url}")
+            finally:
+                cap.release()
+                # Never hand out a frame from a stream that has gone away
+                with self._lock:
+                    self._latest = None
+            self._stop.wait(self.retry_seconds)
+
+    def _sample(self, cap):
+        next_due = time.monotonic()
+        while not self._stop.is_set() and cap.grab():
+            now = time.monotonic()
+            if now < next_due:
+                continue
+            ok, frame = cap.retrieve()
+            if not ok:
+                continue
+            # Skip ahead instead of bursting if we fell behind
+            next_due = max(next_due + self.interval, now)
+            sample = (datetime.now(timezone.utc), downscale(frame, self.max_width))
+            with self._lock:
+                self._latest = sample
@@ -19,12 +19,48 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # Databases that predate migrations already have their tables from create_all()
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "cameras" not in existing:
+        op.create_table(
+            "cameras",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=True),
+            sa.Column("location", sa.String(), nullable=True),
+            sa.Column("status", sa.String(), nullable=True),
+            sa.Column("rtsp_url", sa.String(), nullable=True),
+        )
+    if "alerts" not in existing:
+        op.create_table(
+            "alerts",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("camera_id", sa.Integer(), sa.ForeignKey("cameras.id"), nullable=True),
+            sa.Column(
+                "type",
+                sa.String(),
+                sa.CheckConstraint("type IN ('motion', 'intrusion', 'object_detection', 'camera_offline', 'system_error')"),
+                nullable=False,
+            ),
+            sa.Column("message", sa.String(), nullable=True),
+            sa.Column("severity", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("detection_zone", sa.String(), nullable=True),
+            sa.Column("object_detected", sa.String(), nullable=True),
+            sa.Column("confidence_score", sa.String(), nullable=True),
+            sa.Column("additional_metadata", sa.JSON(), nullable=True),
+        )
+    if "detection_zones" not in existing:
+        op.create_table(
+            "detection_zones",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("camera_id", sa.Integer(), sa.ForeignKey("cameras.id"), nullable=True),
+            sa.Column("name", sa.String(), nullable=True),
+            sa.Column("coordinates", sa.JSON(), nullable=True),
+        )
 
 
 def downgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_table("detection_zones")
+    op.drop_table("alerts")
+    op.drop_table("cameras")
@@ -0,0 +1,145 @@
+"""Partition alerts by day
+
+Revision ID: 3f2a9c1d7b10
+Revises: 61201c11dffd
+Create Date: 2024-12-01 00:00:00.000000
+
+"""
+import os
+from datetime import timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d7b10'
+down_revision: Union[str, None] = '61201c11dffd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ALERT_PARTITIONS_AHEAD = int(os.getenv("ALERT_PARTITIONS_AHEAD", "7"))
+ALERT_TYPES = "'motion', 'intrusion', 'object_detection', 'camera_offline', 'system_error'"
+COPY_COLUMNS = (
+    "id, camera_id, type, message, severity, detection_zone, "
+    "object_detected, confidence_score, additional_metadata"
+)
+
+
+def _alert_type_column() -> sa.Column:
+    return sa.Column("type", sa.String(), sa.CheckConstraint(f"type IN ({ALERT_TYPES})"), nullable=False)
+
+
+def _upgrade_postgresql() -> None:
+    bind = op.get_bind()
+
+    # Move the existing table out of the way, freeing its index and constraint names
+    op.execute("DROP INDEX IF EXISTS ix_alerts_created_at")
+    op.execute("DROP INDEX IF EXISTS ix_alerts_bucket")
+    op.execute("ALTER TABLE alerts RENAME TO alerts_legacy")
+    op.execute("ALTER TABLE alerts_legacy RENAME CONSTRAINT alerts_pkey TO alerts_legacy_pkey")
+
+    op.execute(f"""
+        CREATE TABLE alerts (
+            id INTEGER NOT NULL DEFAULT nextval('alerts_id_seq'),
+            camera_id INTEGER REFERENCES cameras (id),
+            type VARCHAR NOT NULL CHECK (type IN ({ALERT_TYPES})),
+            message VARCHAR,
+            severity VARCHAR,
+            created_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+            bucket INTEGER NOT NULL,
+            detection_zone VARCHAR,
+            object_detected VARCHAR,
+            confidence_score VARCHAR,
+            additional_metadata JSON,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("CREATE INDEX ix_alerts_created_at ON alerts (created_at)")
+    op.execute("CREATE INDEX ix_alerts_bucket ON alerts (bucket)")
+    op.execute("CREATE TABLE alerts_default PARTITION OF alerts DEFAULT")
+
+    # One partition per day that already holds alerts, plus today and the days ahead,
+    # so new alerts never land in the default partition before the retention job runs
+    days = set(bind.execute(sa.text(
+        "SELECT DISTINCT CAST(COALESCE(created_at, now() AT TIME ZONE 'utc') AS DATE) FROM alerts_legacy"
+    )).scalars().all())
+    today = bind.execute(sa.text("SELECT CAST(now() AT TIME ZONE 'utc' AS DATE)")).scalar()
+    days.update(today + timedelta(days=offset) for offset in range(ALERT_PARTITIONS_AHEAD + 1))
+    for day in sorted(days):
+        op.execute(
+            f"CREATE TABLE alerts_p{day:%Y%m%d} PARTITION OF alerts "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        )
+
+    op.execute(f"""
+        INSERT INTO alerts ({COPY_COLUMNS}, created_at, bucket)
+        SELECT {COPY_COLUMNS},
+               COALESCE(created_at, now() AT TIME ZONE 'utc'),
+               CAST(to_char(COALESCE(created_at, now() AT TIME ZONE 'utc'), 'YYYYMMDD') AS INTEGER)
+        FROM alerts_legacy
+    """)
+    op.execute("ALTER SEQUENCE alerts_id_seq OWNED BY alerts.id")
+    op.execute("DROP TABLE alerts_legacy")
+
+
+def _downgrade_postgresql() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_alerts_created_at")
+    op.execute("ALTER TABLE alerts RENAME TO alerts_partitioned")
+    op.execute("ALTER TABLE alerts_partitioned RENAME CONSTRAINT alerts_pkey TO alerts_partitioned_pkey")
+    op.execute(f"""
+        CREATE TABLE alerts (
+            id INTEGER NOT NULL DEFAULT nextval('alerts_id_seq') PRIMARY KEY,
+            camera_id INTEGER REFERENCES cameras (id),
+            type VARCHAR NOT NULL CHECK (type IN ({ALERT_TYPES})),
+            message VARCHAR,
+            severity VARCHAR,
+            created_at TIMESTAMP,
+            detection_zone VARCHAR,
+            object_detected VARCHAR,
+            confidence_score VARCHAR,
+            additional_metadata JSON
+        )
+    """)
+    op.execute(f"""
+        INSERT INTO alerts ({COPY_COLUMNS}, created_at)
+        SELECT {COPY_COLUMNS}, created_at FROM alerts_partitioned
+    """)
+    op.execute("ALTER SEQUENCE alerts_id_seq OWNED BY alerts.id")
+    op.execute("DROP TABLE alerts_partitioned CASCADE")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        _upgrade_postgresql()
+        return
+
+    # Other databases keep a single table and retire whole day buckets by index.
+    # Tables created by create_all() against the current models already have them.
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("alerts")}
+    if "bucket" in columns:
+        return
+
+    op.execute("UPDATE alerts SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.add_column("alerts", sa.Column("bucket", sa.Integer(), nullable=True))
+    op.execute("UPDATE alerts SET bucket = CAST(strftime('%Y%m%d', created_at) AS INTEGER)")
+    # SQLite cannot alter columns in place, so the table is rebuilt. Reflection does not
+    # pick up the unnamed CHECK on type, so it is declared again here.
+    with op.batch_alter_table("alerts", reflect_args=[_alert_type_column()]) as batch_op:
+        batch_op.alter_column("created_at", existing_type=sa.DateTime(), nullable=False)
+        batch_op.alter_column("bucket", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index("ix_alerts_created_at", ["created_at"])
+        batch_op.create_index("ix_alerts_bucket", ["bucket"])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        _downgrade_postgresql()
+        return
+
+    with op.batch_alter_table("alerts", reflect_args=[_alert_type_column()]) as batch_op:
+        batch_op.drop_index("ix_alerts_bucket")
+        batch_op.drop_index("ix_alerts_created_at")
+        batch_op.drop_column("bucket")
+        batch_op.alter_column("created_at", existing_type=sa.DateTime(), nullable=True)
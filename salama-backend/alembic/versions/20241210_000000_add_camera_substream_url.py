@@ -0,0 +1,26 @@
+"""Add camera substream url
+
+Revision ID: c7f1a3e5d902
+Revises: 8d4e6b2a9c31
+Create Date: 2024-12-10 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7f1a3e5d902'
+down_revision: Union[str, None] = '8d4e6b2a9c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("cameras", sa.Column("substream_url", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("cameras", "substream_url")
@@ -0,0 +1,26 @@
+"""Add camera clip buffer
+
+Revision ID: e2b8d4f6a013
+Revises: c7f1a3e5d902
+Create Date: 2024-12-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8d4f6a013'
+down_revision: Union[str, None] = 'c7f1a3e5d902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("cameras", sa.Column("clip_buffer_mb", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("cameras", "clip_buffer_mb")
@@ -0,0 +1,33 @@
+"""Add config version
+
+Revision ID: a4c9e1f7b215
+Revises: e2b8d4f6a013
+Create Date: 2024-12-20 00:00:00.000000
+
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e1f7b215'
+down_revision: Union[str, None] = 'e2b8d4f6a013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    config_version = op.create_table(
+        "config_version",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+    )
+    # Start above the per-process versions clients may still hold, which were epoch milliseconds
+    op.bulk_insert(config_version, [{"id": 1, "version": int(time.time() * 1000)}])
+
+
+def downgrade() -> None:
+    op.drop_table("config_version")
@@ -0,0 +1,29 @@
+"""Add alert event id
+
+Revision ID: b7d2f5a8c316
+Revises: a4c9e1f7b215
+Create Date: 2024-12-22 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f5a8c316'
+down_revision: Union[str, None] = 'a4c9e1f7b215'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("alerts", sa.Column("event_id", sa.String(length=36), nullable=True))
+    # On PostgreSQL this is created on every partition of alerts
+    op.create_index("ux_alerts_event_id", "alerts", ["event_id", "created_at"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ux_alerts_event_id", table_name="alerts")
+    op.drop_column("alerts", "event_id")
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import cameras, alerts, detection_zones
+from .endpoints import cameras, alerts, detection_zones, config
 
 api_router = APIRouter()
 
@@ -20,3 +20,9 @@ api_router.include_router(
     prefix="/detection-zones",
     tags=["detection-zones"]
 )
+
+api_router.include_router(
+    config.router,
+    prefix="/config",
+    tags=["config"]
+)
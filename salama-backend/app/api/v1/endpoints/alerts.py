@@ -1,10 +1,17 @@
+from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import logging
+import os
 
 from .... import crud, models, schemas
 from ....api import deps
+from ....core.alert_export import export_alerts, ExportError
+from ....core.alert_retention import ALERT_RETENTION_DAYS
+from ....core.clip_recorder import clip_recorder
+from ....database import engine
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +28,37 @@ def read_alerts(
     """Retrieve alerts."""
     return crud.get_alerts(db, skip=skip, limit=limit)
 
+@router.get("/export")
+def export_alerts_stream(
+    format: schemas.ExportFormat = schemas.ExportFormat.NDJSON,
+    compression: schemas.ExportCompression = schemas.ExportCompression.NONE,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    camera_id: Optional[int] = None,
+    type: Optional[schemas.AlertType] = None,
+):
+    """
+    Stream alerts created in [start, end) as NDJSON, CSV or Arrow IPC, optionally compressed.
+    Memory use does not depend on the number of alerts exported.
+    """
+    try:
+        content, media_type, filename = export_alerts(
+            engine,
+            format,
+            compression,
+            start=start,
+            end=end,
+            camera_id=camera_id,
+            alert_type=type,
+        )
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/{alert_id}", response_model=schemas.Alert)
 def read_alert(
     alert_id: int,
@@ -49,21 +87,62 @@ def create_alert(
         logger.info(f"Object Detected: {alert.object_detected}")
         logger.info(f"Confidence Score: {alert.confidence_score}")
         logger.info(f"Additional Metadata: {alert.additional_metadata}")
+        logger.info(f"Event ID: {alert.event_id}")
+        logger.info(f"Observed At: {alert.created_at}")
 
         # Validate camera exists before creating alert
         camera = db.query(models.Camera).filter(models.Camera.id == alert.camera_id).first()
         if not camera:
             raise HTTPException(status_code=400, detail=f"Camera with ID {alert.camera_id} does not exist")
 
+        # A redelivered alert is answered with the one already stored
+        if alert.event_id is not None:
+            existing_alert = crud.get_alert_by_event_id(db, event_id=alert.event_id)
+            if existing_alert:
+                logger.info(f"Alert for event {alert.event_id} already exists")
+                return existing_alert
+
+        # Delayed alerts keep the time they were observed, within the retention period
+        now = datetime.utcnow()
+        if alert.created_at is not None:
+            if alert.created_at < now - timedelta(days=ALERT_RETENTION_DAYS):
+                raise HTTPException(status_code=422, detail="Alert is older than the alert retention period")
+            # Never store alerts ahead of the backend clock
+            alert.created_at = min(alert.created_at, now)
+
+        # Clips are only ever linked by the backend; never trust one sent by the client
+        if alert.additional_metadata and "clip" in alert.additional_metadata:
+            alert.additional_metadata = {k: v for k, v in alert.additional_metadata.items() if k != "clip"}
+
         # Create the alert
         created_alert = crud.create_alert(db=db, alert=alert)
         
         logger.info(f"Alert created successfully: {created_alert}")
+        # The clip recorder picks the stored alert up and links its clip once written
         return created_alert
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating alert: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating alert: {str(e)}")
 
+@router.get("/{alert_id}/clip")
+def read_alert_clip(
+    alert_id: int,
+    db: Session = Depends(deps.get_db)
+):
+    """Download the video clip recorded around an alert."""
+    alert = crud.get_alert(db, alert_id=alert_id)
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    clip = (alert.additional_metadata or {}).get("clip")
+    path = clip_recorder.resolve(clip.get("file")) if isinstance(clip, dict) else None
+    if not path:
+        raise HTTPException(status_code=404, detail="Alert has no clip")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Clip not found")
+    return FileResponse(path, media_type="video/mp4", filename=os.path.basename(path))
+
 @router.delete("/{alert_id}", response_model=schemas.Alert)
 def delete_alert(
     alert_id: int,
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from fastapi.responses import StreamingResponse
 from io import BytesIO
 
 from .... import crud, models, schemas
-from ....core.camera_service import CameraService
+from ....core.camera_service import CameraService, CAMERA_DETECT_WIDTH
+from ....core.config_cache import config_cache, etag_response, CAMERAS
 from ....api import deps
 
 router = APIRouter()
@@ -22,10 +23,12 @@ def create_camera(
 def read_cameras(
     skip: int = 0,
     limit: int = 100,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(deps.get_db)
 ):
-    """Retrieve cameras."""
-    return crud.camera.get_multi(db=db, skip=skip, limit=limit)
+    """Retrieve cameras, served from the config cache with an ETag."""
+    etag, body = config_cache.render_list(db, CAMERAS, skip=skip, limit=limit)
+    return etag_response(etag, body, if_none_match)
 
 @router.get("/{camera_id}", response_model=schemas.Camera)
 def read_camera(
@@ -61,19 +64,37 @@ def delete_camera(
         raise HTTPException(status_code=404, detail="Camera not found")
     return crud.camera.remove(db=db, id=camera_id)
 
+@router.get("/{camera_id}/health", response_model=schemas.CameraHealth)
+def read_camera_health(
+    camera_id: int,
+    db: Session = Depends(deps.get_db)
+):
+    """Get the latest health check of a camera."""
+    health = db.query(models.CameraHealth).filter(models.CameraHealth.camera_id == camera_id).first()
+    if not health:
+        raise HTTPException(status_code=404, detail="Camera health not found")
+    return health
+
 @router.get("/{camera_id}/snapshot")
 async def get_camera_snapshot(
     camera_id: int,
+    purpose: schemas.StreamPurpose = schemas.StreamPurpose.EVIDENCE,
     db: Session = Depends(deps.get_db)
 ):
-    """Get snapshot from camera."""
+    """
+    Get snapshot from camera.
+    Snapshots for detection come from the substream, if any, scaled down for inference.
+    """
     camera = crud.camera.get(db=db, id=camera_id)
     if not camera:
         raise HTTPException(status_code=404, detail="Camera not found")
     
     # Get snapshot using camera service
     camera_service = CameraService()
-    image_bytes = await camera_service.get_camera_snapshot(camera.rtsp_url)
+    max_width = CAMERA_DETECT_WIDTH if purpose == schemas.StreamPurpose.DETECTION else None
+    image_bytes = await camera_service.get_camera_snapshot(
+        camera_service.stream_url(camera, purpose), max_width=max_width
+    )
     
     # Return image
     return StreamingResponse(
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from .... import schemas
+from ....api import deps
+from ....core.config_cache import config_cache
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.ConfigChanges)
+def read_config_changes(
+    since_version: Optional[int] = None,
+    db: Session = Depends(deps.get_db)
+):
+    """
+    Cameras and detection zones changed after `since_version`.
+    Without `since_version`, or when it is too old, the full configuration is returned.
+    """
+    return config_cache.changes(db, since_version=since_version)
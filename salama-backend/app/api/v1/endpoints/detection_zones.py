@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from .... import crud, models, schemas
 from ....api import deps
+from ....core.config_cache import config_cache, etag_response, DETECTION_ZONES
 
 router = APIRouter()
 
@@ -11,10 +12,12 @@ router = APIRouter()
 def read_zones(
     skip: int = 0,
     limit: int = 100,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(deps.get_db)
 ):
-    """Retrieve detection zones."""
-    return crud.get_zones(db, skip=skip, limit=limit)
+    """Retrieve detection zones, served from the config cache with an ETag."""
+    etag, body = config_cache.render_list(db, DETECTION_ZONES, skip=skip, limit=limit)
+    return etag_response(etag, body, if_none_match)
 
 @router.get("/{zone_id}", response_model=schemas.DetectionZone)
 def read_zone(
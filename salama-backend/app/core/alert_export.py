@@ -0,0 +1,199 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from .. import models, schemas
+
+EXPORT_BATCH_SIZE = 5000
+
+EXPORT_COLUMNS = [
+    "id", "camera_id", "type", "message", "severity", "created_at",
+    "detection_zone", "object_detected", "confidence_score", "additional_metadata",
+]
+
+MEDIA_TYPES = {
+    schemas.ExportFormat.NDJSON: "application/x-ndjson",
+    schemas.ExportFormat.CSV: "text/csv",
+    schemas.ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+}
+
+COMPRESSED_MEDIA_TYPES = {
+    schemas.ExportCompression.GZIP: "application/gzip",
+    schemas.ExportCompression.ZSTD: "application/zstd",
+}
+
+EXTENSIONS = {
+    schemas.ExportFormat.NDJSON: "ndjson",
+    schemas.ExportFormat.CSV: "csv",
+    schemas.ExportFormat.ARROW: "arrow",
+    schemas.ExportCompression.GZIP: "gz",
+    schemas.ExportCompression.ZSTD: "zst",
+}
+
+
+class ExportError(ValueError):
+    """The requested export cannot be produced, e.g. an optional dependency is missing."""
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def iter_alert_rows(
+    engine: Engine,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    camera_id: Optional[int] = None,
+    alert_type: Optional[schemas.AlertType] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[List[Sequence[Any]]]:
+    """
+    Yield alerts in ``[start, end)`` as batches of plain row tuples.
+
+    Rows are read through a server-side cursor and never become ORM objects, so
+    memory use stays at one batch regardless of how many alerts match.
+    """
+    table = models.Alert.__table__
+    stmt = select([table.c[name] for name in EXPORT_COLUMNS])
+    if start is not None:
+        stmt = stmt.where(table.c.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(table.c.created_at < end)
+    if camera_id is not None:
+        stmt = stmt.where(table.c.camera_id == camera_id)
+    if alert_type is not None:
+        stmt = stmt.where(table.c.type == alert_type.value)
+    stmt = stmt.order_by(table.c.created_at, table.c.id)
+
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(stmt)
+        for rows in result.partitions(batch_size):
+            yield rows
+
+
+def _ndjson_chunks(batches: Iterator[List[Sequence[Any]]]) -> Iterator[bytes]:
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default) + "\n"
+            for row in rows
+        ).encode()
+
+
+def _csv_chunks(batches: Iterator[List[Sequence[Any]]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    metadata = EXPORT_COLUMNS.index("additional_metadata")
+    for rows in batches:
+        for row in rows:
+            row = list(row)
+            if row[metadata] is not None:
+                row[metadata] = json.dumps(row[metadata])
+            writer.writerow(row)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _arrow_chunks(batches: Iterator[List[Sequence[Any]]]) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("camera_id", pa.int64()),
+        ("type", pa.string()),
+        ("message", pa.string()),
+        ("severity", pa.string()),
+        ("created_at", pa.timestamp("us")),
+        ("detection_zone", pa.string()),
+        ("object_detected", pa.string()),
+        ("confidence_score", pa.string()),
+        ("additional_metadata", pa.string()),  # JSON encoded
+    ])
+    metadata = EXPORT_COLUMNS.index("additional_metadata")
+
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate(0)
+        return data
+
+    yield drain()
+    for rows in batches:
+        columns = [list(column) for column in zip(*rows)]
+        columns[metadata] = [None if v is None else json.dumps(v) for v in columns[metadata]]
+        writer.write_batch(pa.record_batch(columns, schema=schema))
+        yield drain()
+    writer.close()
+    yield drain()
+
+
+def _compressor(compression: schemas.ExportCompression) -> Optional[Callable[[], Any]]:
+    if compression == schemas.ExportCompression.GZIP:
+        return lambda: zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if compression == schemas.ExportCompression.ZSTD:
+        try:
+            import zstandard
+        except ImportError:
+            raise ExportError("zstd compression requires the zstandard package")
+        return lambda: zstandard.ZstdCompressor(level=3).compressobj()
+    return None
+
+
+def _compressed(chunks: Iterator[bytes], new_compressor: Callable[[], Any]) -> Iterator[bytes]:
+    compressor = new_compressor()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+FORMATTERS = {
+    schemas.ExportFormat.NDJSON: _ndjson_chunks,
+    schemas.ExportFormat.CSV: _csv_chunks,
+    schemas.ExportFormat.ARROW: _arrow_chunks,
+}
+
+
+def export_alerts(
+    engine: Engine,
+    export_format: schemas.ExportFormat,
+    compression: schemas.ExportCompression = schemas.ExportCompression.NONE,
+    **filters: Any,
+) -> Tuple[Iterator[bytes], str, str]:
+    """
+    Prepare a streaming export of alerts.
+
+    Returns the byte chunks to stream, their media type and a file name.
+    Missing optional dependencies raise ``ExportError`` here, before anything is streamed.
+    """
+    new_compressor = _compressor(compression)
+    if export_format == schemas.ExportFormat.ARROW:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ExportError("Arrow export requires the pyarrow package")
+
+    chunks = FORMATTERS[export_format](iter_alert_rows(engine, **filters))
+    filename = f"alerts.{EXTENSIONS[export_format]}"
+    media_type = MEDIA_TYPES[export_format]
+    if new_compressor is not None:
+        chunks = _compressed(chunks, new_compressor)
+        filename += f".{EXTENSIONS[compression]}"
+        media_type = COMPRESSED_MEDIA_TYPES[compression]
+
+    return chunks, media_type, filename
@@ -0,0 +1,235 @@
+import gzip
+import json
+import logging
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from ..models import alert_bucket
+
+logger = logging.getLogger(__name__)
+
+# Retention configuration
+ALERT_RETENTION_DAYS = int(os.getenv("ALERT_RETENTION_DAYS", "90"))
+ALERT_PARTITIONS_AHEAD = int(os.getenv("ALERT_PARTITIONS_AHEAD", "7"))
+ALERT_ARCHIVE_DIR = os.getenv("ALERT_ARCHIVE_DIR", "./archive/alerts")
+
+PARTITION_PREFIX = "alerts_p"
+# Catches alerts for days without a partition, e.g. late alerts or ones stored before ensure_partitions ran
+DEFAULT_PARTITION = "alerts_default"
+
+ALERT_COLUMNS = [
+    "id", "camera_id", "type", "message", "severity", "created_at", "bucket",
+    "detection_zone", "object_detected", "confidence_score", "additional_metadata", "event_id",
+]
+
+
+def is_partitioned(engine: Engine) -> bool:
+    """Alerts are range-partitioned by day on PostgreSQL, bucketed elsewhere."""
+    return engine.dialect.name == "postgresql"
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def bucket_to_date(bucket: int) -> date:
+    return date(bucket // 10000, bucket // 100 % 100, bucket % 100)
+
+
+def _create_partition(conn, day: date) -> bool:
+    """Create the partition for ``day`` unless it exists; returns whether it was created."""
+    name = partition_name(day)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+
+    bounds = {"start": day, "end": day + timedelta(days=1)}
+    in_range = "created_at >= :start AND created_at < :end"
+    create = (
+        f"CREATE TABLE {name} PARTITION OF alerts "
+        f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    )
+    stranded = conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"), bounds
+    ).scalar()
+    if not stranded:
+        conn.execute(text(create))
+        return True
+
+    # Rows for the day already sit in the default partition, which blocks creating
+    # the day's partition; move them over while the default partition is detached
+    columns = ", ".join(ALERT_COLUMNS)
+    conn.execute(text(f"ALTER TABLE alerts DETACH PARTITION {DEFAULT_PARTITION}"))
+    conn.execute(text(create))
+    conn.execute(text(
+        f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} WHERE {in_range}"
+    ), bounds)
+    conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+    conn.execute(text(f"ALTER TABLE alerts ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return True
+
+
+def ensure_partitions(engine: Engine, days_ahead: int = ALERT_PARTITIONS_AHEAD) -> List[str]:
+    """
+    Create the daily alert partitions from today up to ``days_ahead`` days ahead,
+    moving in alerts that landed in the default partition for those days.
+    Each day is created in its own transaction, so one failing day does not hold
+    back the others. Does nothing on databases without native partitioning.
+    """
+    if not is_partitioned(engine):
+        return []
+
+    created = []
+    today = datetime.utcnow().date()
+    for offset in range(days_ahead + 1):
+        day = today + timedelta(days=offset)
+        try:
+            with engine.begin() as conn:
+                if _create_partition(conn, day):
+                    created.append(partition_name(day))
+        except Exception as e:
+            logger.error(f"Failed to create alert partition for {day}: {str(e)}")
+    return created
+
+
+def _expired_sources(conn, cutoff: int, partitioned: bool) -> Dict[int, List[Tuple[str, bool]]]:
+    """
+    Tables holding each expired bucket, as ``(table, whole)`` pairs. A whole table is a
+    day partition that is dropped; otherwise the bucket's rows are deleted from the table.
+    """
+    sources: Dict[int, List[Tuple[str, bool]]] = {}
+    if partitioned:
+        rows = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'alerts' AND c.relname LIKE :prefix"
+        ), {"prefix": f"{PARTITION_PREFIX}%"})
+        for (name,) in rows:
+            bucket = int(name[len(PARTITION_PREFIX):])
+            if bucket < cutoff:
+                sources.setdefault(bucket, []).append((name, True))
+        table = DEFAULT_PARTITION
+    else:
+        table = "alerts"
+
+    rows = conn.execute(
+        text(f"SELECT DISTINCT bucket FROM {table} WHERE bucket < :cutoff"),
+        {"cutoff": cutoff},
+    )
+    for (bucket,) in rows:
+        sources.setdefault(bucket, []).append((table, False))
+    return dict(sorted(sources.items()))
+
+
+def archive_path(archive_dir: str, bucket: int) -> str:
+    return os.path.join(archive_dir, f"alerts-{bucket}.jsonl.gz")
+
+
+def _write_archive(conn, bucket: int, sources: List[Tuple[str, bool]], archive_dir: str) -> int:
+    """
+    Stream one bucket of alerts into a gzip-compressed JSON lines file.
+    The file is written under a unique temporary name and renamed into place once complete.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = archive_path(archive_dir, bucket)
+    fd, tmp_path = tempfile.mkstemp(dir=archive_dir, prefix=f"alerts-{bucket}.", suffix=".tmp")
+
+    count = 0
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+            for table, whole in sources:
+                query = f"SELECT {', '.join(ALERT_COLUMNS)} FROM {table}"
+                if not whole:
+                    query += " WHERE bucket = :bucket"
+                result = conn.execution_options(stream_results=True).execute(text(query), {"bucket": bucket})
+                for row in result:
+                    record = dict(row._mapping)
+                    if isinstance(record["additional_metadata"], str):
+                        record["additional_metadata"] = json.loads(record["additional_metadata"])
+                    f.write(json.dumps(record, default=str) + "\n")
+                    count += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def run_retention(
+    engine: Engine,
+    retention_days: int = ALERT_RETENTION_DAYS,
+    archive_dir: Optional[str] = ALERT_ARCHIVE_DIR,
+) -> Dict[int, int]:
+    """
+    Archive and drop every alert bucket older than ``retention_days``.
+
+    On PostgreSQL each expired day is a partition that gets detached and dropped,
+    so the cost does not depend on the number of rows in it; expired rows left in
+    the default partition are deleted by bucket. Elsewhere the day bucket is
+    removed with a single indexed delete. Returns the number of rows
+    archived per bucket.
+
+    Only one process may run this at a time; the application runs it from the
+    worker holding ``background_leader``.
+    """
+    partitioned = is_partitioned(engine)
+    cutoff = alert_bucket(datetime.utcnow() - timedelta(days=retention_days))
+    archived = {}
+
+    with engine.connect() as conn:
+        expired = _expired_sources(conn, cutoff, partitioned)
+
+    for bucket, sources in expired.items():
+        with engine.begin() as conn:
+            count = 0
+            if archive_dir:
+                count = _write_archive(conn, bucket, sources, archive_dir)
+            for table, whole in sources:
+                if whole:
+                    conn.execute(text(f"ALTER TABLE alerts DETACH PARTITION {table}"))
+                    conn.execute(text(f"DROP TABLE {table}"))
+                else:
+                    conn.execute(text(f"DELETE FROM {table} WHERE bucket = :bucket"), {"bucket": bucket})
+        archived[bucket] = count
+        logger.info(f"Retired alert bucket {bucket} ({count} alerts archived)")
+
+    return archived
+
+
+def iter_archived_alerts(
+    archive_dir: str = ALERT_ARCHIVE_DIR,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    camera_id: Optional[int] = None,
+) -> Iterator[Dict]:
+    """Iterate archived alerts in ``[start, end)``, reading only the day files that overlap it."""
+    if not os.path.isdir(archive_dir):
+        return
+
+    first = alert_bucket(start) if start else None
+    last = alert_bucket(end) if end else None
+    for filename in sorted(os.listdir(archive_dir)):
+        if not (filename.startswith("alerts-") and filename.endswith(".jsonl.gz")):
+            continue
+        bucket = int(filename[len("alerts-"):-len(".jsonl.gz")])
+        if (first is not None and bucket < first) or (last is not None and bucket > last):
+            continue
+
+        with gzip.open(os.path.join(archive_dir, filename), "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                created_at = datetime.fromisoformat(record["created_at"])
+                if start and created_at < start:
+                    continue
+                if end and created_at >= end:
+                    continue
+                if camera_id is not None and record["camera_id"] != camera_id:
+                    continue
+                record["created_at"] = created_at
+                yield record
@@ -0,0 +1,221 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .. import crud, models, schemas
+from ..database import SessionLocal
+from .camera_service import CAMERA_TIMEOUT_MS, open_stream
+from .leader import background_leader
+
+logger = logging.getLogger(__name__)
+
+# Health check configuration
+CAMERA_HEALTH_INTERVAL_SECONDS = float(os.getenv("CAMERA_HEALTH_INTERVAL_SECONDS", "30"))
+CAMERA_HEALTH_WORKERS = int(os.getenv("CAMERA_HEALTH_WORKERS", "64"))
+CAMERA_HEALTH_TIMEOUT_MS = int(os.getenv("CAMERA_HEALTH_TIMEOUT_MS", str(CAMERA_TIMEOUT_MS)))
+# Consecutive failed probes before a camera is reported offline
+CAMERA_OFFLINE_AFTER_FAILURES = int(os.getenv("CAMERA_OFFLINE_AFTER_FAILURES", "2"))
+
+ONLINE_STATUS = "active"
+OFFLINE_STATUS = "offline"
+# Cameras an operator has put in any other status are left alone
+PROBED_STATUSES = (ONLINE_STATUS, OFFLINE_STATUS)
+
+
+@dataclass
+class ProbeResult:
+    camera_id: int
+    online: bool
+    latency_ms: Optional[float] = None
+    fps: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    error: Optional[str] = None
+
+
+def probe_camera(camera_id: int, rtsp_url: str, timeout_ms: int = CAMERA_HEALTH_TIMEOUT_MS) -> ProbeResult:
+    """
+    Connect to a camera and grab one frame without decoding it.
+    Connect and read are both bounded by ``timeout_ms``.
+    """
+    import cv2  # Deferred so the API starts without loading OpenCV
+
+    started = time.monotonic()
+    cap = None
+    try:
+        cap = open_stream(rtsp_url, timeout_ms)
+        if not cap.isOpened():
+            return ProbeResult(camera_id, False, error="Failed to connect to camera stream")
+        if not cap.grab():
+            return ProbeResult(camera_id, False, error="Failed to capture frame from camera")
+
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        return ProbeResult(
+            camera_id,
+            True,
+            latency_ms=(time.monotonic() - started) * 1000,
+            fps=fps or None,
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or None,
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or None,
+        )
+    except Exception as e:
+        return ProbeResult(camera_id, False, error=str(e))
+    finally:
+        if cap is not None:
+            cap.release()
+
+
+class CameraHealthMonitor:
+    """
+    Periodically probes every camera and keeps ``camera_health`` up to date.
+
+    Probes run on a dedicated, bounded thread pool so a sweep over hundreds of
+    cameras never competes with request handling for the API thread pool. A camera
+    whose probes keep failing is marked offline and a ``camera_offline`` alert is
+    raised once; it is marked active again when a probe succeeds.
+
+    Only the worker holding ``background_leader`` sweeps, so with several workers
+    each camera is still probed once per interval.
+    """
+
+    def __init__(
+        self,
+        interval: float = CAMERA_HEALTH_INTERVAL_SECONDS,
+        workers: int = CAMERA_HEALTH_WORKERS,
+        timeout_ms: int = CAMERA_HEALTH_TIMEOUT_MS,
+    ):
+        self.interval = interval
+        self.timeout_ms = timeout_ms
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="camera-probe")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="camera-health", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=False)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                if background_leader.acquire():
+                    self.sweep()
+            except Exception as e:
+                logger.error(f"Camera health sweep failed: {str(e)}")
+            self._stop.wait(max(self.interval - (time.monotonic() - started), 0))
+
+    def sweep(self) -> List[ProbeResult]:
+        """Probe all monitored cameras concurrently and record the results."""
+        # Camera rows stay usable across the commits below
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            cameras = (
+                db.query(models.Camera)
+                .filter(models.Camera.status.in_(PROBED_STATUSES))
+                .all()
+            )
+            targets = [(camera.id, camera.rtsp_url) for camera in cameras if camera.rtsp_url]
+            # Release the connection while the probes run
+            db.commit()
+
+            started = time.monotonic()
+            results = list(self._executor.map(
+                lambda target: probe_camera(*target, timeout_ms=self.timeout_ms), targets
+            ))
+            logger.info(
+                f"Probed {len(results)} cameras in {time.monotonic() - started:.2f}s, "
+                f"{sum(not r.online for r in results)} unreachable"
+            )
+
+            self._record(db, {camera.id: camera for camera in cameras}, results)
+            return results
+        finally:
+            db.close()
+
+    def _record(self, db, cameras: Dict[int, models.Camera], results: List[ProbeResult]) -> None:
+        now = datetime.utcnow()
+        # Cameras deleted while they were being probed are skipped
+        existing = {
+            id for (id,) in db.query(models.Camera.id).filter(
+                models.Camera.id.in_([r.camera_id for r in results])
+            )
+        }
+        results = [r for r in results if r.camera_id in existing]
+        health = {
+            h.camera_id: h
+            for h in db.query(models.CameraHealth).filter(
+                models.CameraHealth.camera_id.in_([r.camera_id for r in results])
+            )
+        }
+
+        went_offline, came_online = [], []
+        for result in results:
+            row = health.get(result.camera_id)
+            if row is None:
+                row = models.CameraHealth(camera_id=result.camera_id, consecutive_failures=0)
+                db.add(row)
+            row.online = result.online
+            row.consecutive_failures = 0 if result.online else (row.consecutive_failures or 0) + 1
+            row.latency_ms = result.latency_ms
+            row.fps = result.fps
+            row.width = result.width
+            row.height = result.height
+            row.last_error = result.error
+            row.checked_at = now
+
+            camera = cameras[result.camera_id]
+            if camera.status == ONLINE_STATUS and row.consecutive_failures >= CAMERA_OFFLINE_AFTER_FAILURES:
+                went_offline.append((camera, result))
+            elif camera.status == OFFLINE_STATUS and result.online:
+                came_online.append(camera)
+        db.commit()
+
+        # Each camera is handled on its own, so one failure does not skip the others
+        for camera, result in went_offline:
+            try:
+                if not self._set_status(db, camera, ONLINE_STATUS, OFFLINE_STATUS):
+                    continue
+                crud.create_alert(db, schemas.AlertCreate(
+                    message=f"Camera {camera.name} is offline: {result.error}",
+                    severity="high",
+                    camera_id=camera.id,
+                    type=schemas.AlertType.CAMERA_OFFLINE,
+                    additional_metadata={"error": result.error},
+                ))
+                logger.warning(f"Camera {camera.id} went offline: {result.error}")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to mark camera {camera.id} offline: {str(e)}")
+        for camera in came_online:
+            try:
+                if self._set_status(db, camera, OFFLINE_STATUS, ONLINE_STATUS):
+                    logger.info(f"Camera {camera.id} is back online")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to mark camera {camera.id} online: {str(e)}")
+
+    def _set_status(self, db, camera: models.Camera, expected: str, status: str) -> bool:
+        """
+        Move ``camera`` from ``expected`` to ``status``, unless it was deleted or its status
+        changed since the sweep started. Goes through crud so the config version is bumped.
+        """
+        if db.query(models.Camera.status).filter(models.Camera.id == camera.id).scalar() != expected:
+            return False
+        crud.camera.update(db, db_obj=camera, obj_in={"status": status})
+        return True
+
+
+camera_health_monitor = CameraHealthMonitor()
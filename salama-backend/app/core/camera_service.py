@@ -1,50 +1,133 @@
-import cv2
-import numpy as np
+import os
+from typing import Optional
+
 from fastapi import HTTPException
-from fastapi.responses import StreamingResponse
-import io
-from PIL import Image
+from fastapi.concurrency import run_in_threadpool
+
+from .. import schemas
+
+# Width frames used for detection are scaled down to
+CAMERA_DETECT_WIDTH = int(os.getenv("CAMERA_DETECT_WIDTH", "640"))
+# Limit on connecting to a camera and on waiting for each frame, so a dead camera cannot block
+CAMERA_TIMEOUT_MS = int(os.getenv("CAMERA_TIMEOUT_MS", "2000"))
+
+def open_stream(url: str, timeout_ms: int = CAMERA_TIMEOUT_MS):
+    """Open a camera stream with FFmpeg, with connect and read bounded by ``timeout_ms``."""
+    import cv2  # Deferred so the API starts without loading OpenCV
+
+    return cv2.VideoCapture(url, cv2.CAP_FFMPEG, [
+        cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+        cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms,
+    ])
+
+def downscale(frame, max_width: Optional[int]):
+    """Shrink a frame to at most ``max_width`` pixels wide, keeping its aspect ratio."""
+    import cv2
+
+    if not max_width or frame.shape[1] <= max_width:
+        return frame
+    height = round(frame.shape[0] * max_width / frame.shape[1])
+    return cv2.resize(frame, (max_width, height), interpolation=cv2.INTER_AREA)
+
+class CameraCapture:
+    """
+    Read single frames from a camera stream, e.g. for snapshots.
+
+    Frames are scaled down to ``max_width``. Connecting and waiting for a frame are
+    each bounded by ``timeout_ms``. Continuous sampling for detection happens in the
+    detector, which keeps its own stream per camera open.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_width: Optional[int] = CAMERA_DETECT_WIDTH,
+        timeout_ms: int = CAMERA_TIMEOUT_MS,
+    ):
+        self.url = url
+        self.max_width = max_width
+        self.timeout_ms = timeout_ms
+        self.cap = None
+
+    def open(self) -> None:
+        import cv2  # Deferred so the API starts without loading OpenCV
+
+        self.cap = open_stream(self.url, self.timeout_ms)
+        if not self.cap.isOpened():
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to connect to camera stream"
+            )
+        # Keep as little as possible queued so the frame read is current
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def read(self):
+        """Grab and convert the current frame, scaled down to ``max_width``."""
+        if self.cap is None:
+            self.open()
+        if not self.cap.grab():
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to capture frame from camera"
+            )
+        ok, frame = self.cap.retrieve()
+        if not ok:
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to capture frame from camera"
+            )
+        return downscale(frame, self.max_width)
+
+    def release(self) -> None:
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def __enter__(self) -> "CameraCapture":
+        self.open()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
 
 class CameraService:
     @staticmethod
-    async def get_camera_snapshot(rtsp_url: str) -> bytes:
-        """Capture snapshot from camera RTSP stream."""
+    def stream_url(camera, purpose: schemas.StreamPurpose = schemas.StreamPurpose.EVIDENCE) -> str:
+        """
+        URL to read ``camera`` from. Detection uses the low-resolution substream when
+        the camera has one; evidence always comes from the main stream.
+        """
+        if purpose == schemas.StreamPurpose.DETECTION and camera.substream_url:
+            return camera.substream_url
+        return camera.rtsp_url
+
+    @staticmethod
+    def _snapshot(rtsp_url: str, max_width: Optional[int] = None) -> bytes:
+        import cv2  # Deferred so the API starts without loading OpenCV
+
+        with CameraCapture(rtsp_url, max_width=max_width) as capture:
+            frame = capture.read()
+
+        # Convert to JPEG
         try:
-            # Open video capture
-            cap = cv2.VideoCapture(rtsp_url)
-            if not cap.isOpened():
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to connect to camera stream"
-                )
-
-            # Try to read frame with timeout
-            ret, frame = cap.read()
-            if not ret:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to capture frame from camera"
-                )
-
-            # Release capture immediately
-            cap.release()
-
-            # Convert to JPEG
-            try:
-                _, buffer = cv2.imencode('.jpg', frame)
-                return buffer.tobytes()
-            except Exception as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to encode image"
-                )
+            _, buffer = cv2.imencode('.jpg', frame)
+            return buffer.tobytes()
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to encode image"
+            )
 
+    @staticmethod
+    async def get_camera_snapshot(rtsp_url: str, max_width: Optional[int] = None) -> bytes:
+        """
+        Capture snapshot from camera RTSP stream.
+        The capture runs on the thread pool, bounded by the camera timeouts.
+        """
+        try:
+            return await run_in_threadpool(CameraService._snapshot, rtsp_url, max_width)
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Camera snapshot error: {str(e)}"
             )
-        finally:
-            # Ensure capture is released
-            if 'cap' in locals():
-                cap.release()
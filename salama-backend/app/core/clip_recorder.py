@@ -0,0 +1,471 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+from .. import crud, models
+from ..database import SessionLocal
+from .camera_service import CAMERA_TIMEOUT_MS
+from .config_cache import read_version
+from .leader import background_leader
+
+logger = logging.getLogger(__name__)
+
+# Clip recording configuration
+CLIP_RECORDING_ENABLED = os.getenv("CLIP_RECORDING_ENABLED", "false").lower() == "true"
+CLIP_DIR = os.getenv("CLIP_DIR", "./clips")
+CLIP_PRE_SECONDS = float(os.getenv("CLIP_PRE_SECONDS", "10"))
+CLIP_POST_SECONDS = float(os.getenv("CLIP_POST_SECONDS", "10"))
+# Memory budgets for buffered packets; a camera's clip_buffer_mb overrides the default
+CLIP_BUFFER_DEFAULT_MB = float(os.getenv("CLIP_BUFFER_DEFAULT_MB", "32"))
+CLIP_BUFFER_TOTAL_MB = float(os.getenv("CLIP_BUFFER_TOTAL_MB", "1024"))
+CLIP_CAMERA_REFRESH_SECONDS = float(os.getenv("CLIP_CAMERA_REFRESH_SECONDS", "10"))
+# How often the recorder looks for new alerts to cut clips for
+CLIP_POLL_SECONDS = float(os.getenv("CLIP_POLL_SECONDS", "1"))
+CLIP_RETENTION_DAYS = float(os.getenv("CLIP_RETENTION_DAYS", "30"))
+
+MB = 1024 * 1024
+# Alert ids are re-checked this far back, since ids can commit out of order
+ALERT_ID_OVERLAP = 100
+
+
+@dataclass
+class BufferedPacket:
+    """One compressed video packet, as received from the camera."""
+    timestamp: float  # Wall-clock time the packet arrived
+    data: bytes
+    pts: Optional[int]
+    dts: int
+    keyframe: bool
+
+
+class PacketBudget:
+    """Byte budget shared by all packet buffers."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def add(self, size: int) -> bool:
+        """Account for ``size`` more bytes; returns whether the total is still within the limit."""
+        with self._lock:
+            self.used += size
+            return self.used <= self.limit
+
+    def release(self, size: int) -> None:
+        with self._lock:
+            self.used -= size
+
+
+class PacketRingBuffer:
+    """
+    Bounded buffer of the most recent compressed packets of one camera.
+
+    The oldest packets are dropped once the buffer exceeds its own byte budget, or
+    while the global budget shared with other cameras is exceeded.
+    """
+
+    def __init__(self, limit: int, budget: PacketBudget):
+        self.limit = limit
+        self.budget = budget
+        self.size = 0
+        self._packets: Deque[BufferedPacket] = deque()
+        self._lock = threading.Lock()
+
+    def push(self, packet: BufferedPacket) -> None:
+        with self._lock:
+            self._packets.append(packet)
+            self.size += len(packet.data)
+            within_budget = self.budget.add(len(packet.data))
+            while len(self._packets) > 1 and (self.size > self.limit or not within_budget):
+                dropped = self._packets.popleft()
+                self.size -= len(dropped.data)
+                self.budget.release(len(dropped.data))
+                within_budget = self.budget.used <= self.budget.limit
+
+    def oldest(self) -> Optional[float]:
+        """Arrival time of the oldest buffered packet, or None while the buffer is empty."""
+        with self._lock:
+            return self._packets[0].timestamp if self._packets else None
+
+    def preroll(self, start: float) -> List[BufferedPacket]:
+        """
+        Buffered packets from the last keyframe at or before ``start``, so a clip can be
+        decoded from its first packet. Falls back to the first buffered keyframe.
+        """
+        with self._lock:
+            packets = list(self._packets)
+        first = None
+        for i, packet in enumerate(packets):
+            if packet.keyframe and (first is None or packet.timestamp <= start):
+                first = i
+            if packet.timestamp > start and first is not None:
+                break
+        return [] if first is None else packets[first:]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.budget.release(self.size)
+            self._packets.clear()
+            self.size = 0
+
+
+class ClipWriter:
+    """
+    Writes packets into an MP4 file as they are, without decoding or re-encoding.
+    The file is written as ``<path>.part`` and renamed into place by ``close``.
+    """
+
+    def __init__(self, path: str, template, end: float):
+        import av  # Deferred so the API starts without loading FFmpeg
+
+        self.path = path
+        self.end = end
+        self.tmp_path = f"{path}.part"
+        self.time_base = template.time_base
+        self.written = 0
+        self._first_dts = None
+        self._container = av.open(self.tmp_path, mode="w", format="mp4")
+        self._stream = self._container.add_stream_from_template(template)
+
+    def write(self, packet: BufferedPacket) -> None:
+        import av
+
+        # A clip has to start on a keyframe to be playable
+        if self._first_dts is None:
+            if not packet.keyframe:
+                return
+            self._first_dts = packet.dts
+        out = av.Packet(packet.data)
+        out.dts = packet.dts - self._first_dts
+        out.pts = (packet.dts if packet.pts is None else packet.pts) - self._first_dts
+        out.time_base = self.time_base
+        out.is_keyframe = packet.keyframe
+        out.stream = self._stream
+        self._container.mux(out)
+        self.written += 1
+
+    def close(self) -> bool:
+        """Finish the file; returns whether a playable clip was written."""
+        try:
+            self._container.close()
+            if self.written:
+                os.replace(self.tmp_path, self.path)
+                return True
+        except Exception as e:
+            logger.error(f"Failed to finish clip {self.path}: {str(e)}")
+        # A leftover .part would only take up space
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        return False
+
+
+@dataclass
+class ClipRequest:
+    path: str
+    start: float
+    end: float
+    on_done: Callable[[bool], None]
+
+
+class CameraRecorder:
+    """
+    Keeps one camera's packet buffer filled from its main stream on a background thread
+    and writes the clips requested for it. Packets are demuxed only, never decoded.
+    """
+
+    def __init__(self, camera_id: int, url: str, buffer: PacketRingBuffer, timeout_ms: int = CAMERA_TIMEOUT_MS):
+        self.camera_id = camera_id
+        self.url = url
+        self.buffer = buffer
+        self.timeout_ms = timeout_ms
+        self._requests: "queue.Queue[ClipRequest]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"clip-recorder-{camera_id}", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def join(self) -> None:
+        self._thread.join()
+        self.buffer.clear()
+
+    def request_clip(self, request: ClipRequest) -> None:
+        self._requests.put(request)
+
+    def _run(self) -> None:
+        import av  # Deferred so the API starts without loading FFmpeg
+
+        timeout = self.timeout_ms / 1000
+        while not self._stop.is_set():
+            writers: Dict[ClipWriter, ClipRequest] = {}
+            container = None
+            try:
+                container = av.open(self.url, options={"rtsp_transport": "tcp"}, timeout=(timeout, timeout))
+                stream = container.streams.video[0]
+                # Timestamps from an earlier connection do not continue into this one
+                self.buffer.clear()
+                for packet in container.demux(stream):
+                    if self._stop.is_set():
+                        break
+                    if packet.dts is None:
+                        continue
+                    buffered = BufferedPacket(
+                        time.time(), bytes(packet), packet.pts, packet.dts, packet.is_keyframe
+                    )
+                    self.buffer.push(buffered)
+                    self._start_clips(stream, writers)
+                    for writer in list(writers):
+                        writer.write(buffered)
+                        if buffered.timestamp >= writer.end:
+                            writers.pop(writer).on_done(writer.close())
+            except Exception as e:
+                logger.warning(f"Clip recording for camera {self.camera_id} failed: {str(e)}")
+            finally:
+                # Clips cut short by a dropped stream keep what was recorded
+                for writer, request in writers.items():
+                    request.on_done(writer.close())
+                if container is not None:
+                    container.close()
+            # Reconnect after the stream drops, without spinning on a dead camera
+            self._stop.wait(5)
+
+    def _start_clips(self, stream, writers: Dict["ClipWriter", ClipRequest]) -> None:
+        while True:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                writer = ClipWriter(request.path, stream, request.end)
+                for packet in self.buffer.preroll(request.start):
+                    writer.write(packet)
+                writers[writer] = request
+            except Exception as e:
+                logger.error(f"Failed to start clip {request.path}: {str(e)}")
+                request.on_done(False)
+
+
+class ClipRecorderManager:
+    """
+    Records every active camera into memory and cuts clips around new alerts.
+
+    Only the worker holding ``background_leader`` records, so each camera has one
+    recording session however many workers serve the API. Instead of being told
+    about alerts by the worker that stored them, the recorder picks up committed
+    alerts from the database and links each finished clip into the alert's
+    ``additional_metadata``. Clips are cut from the camera's compressed packets,
+    so no frame is decoded or encoded.
+    """
+
+    def __init__(self, clip_dir: str = CLIP_DIR):
+        self.clip_dir = clip_dir
+        self.budget = PacketBudget(int(CLIP_BUFFER_TOTAL_MB * MB))
+        self.recorders: Dict[int, CameraRecorder] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._config_version = None
+        self._synced_at = 0.0
+        self._last_alert_id: Optional[int] = None
+        self._seen_alert_ids: Set[int] = set()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="clip-recorders", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._stop_recorders()
+
+    def _stop_recorders(self) -> None:
+        with self._lock:
+            recorders, self.recorders = list(self.recorders.values()), {}
+        for recorder in recorders:
+            recorder.stop()
+        for recorder in recorders:
+            recorder.join()
+        self._config_version = None
+        self._synced_at = 0.0
+        self._last_alert_id = None
+        self._seen_alert_ids.clear()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if background_leader.acquire():
+                    if time.monotonic() - self._synced_at >= CLIP_CAMERA_REFRESH_SECONDS:
+                        self._synced_at = time.monotonic()
+                        self._sync_cameras()
+                    self._poll_alerts()
+                elif self.recorders or self._last_alert_id is not None:
+                    # Another worker took over recording
+                    self._stop_recorders()
+            except Exception as e:
+                logger.error(f"Clip recorder failed: {str(e)}")
+            self._stop.wait(CLIP_POLL_SECONDS)
+
+    def _sync_cameras(self) -> None:
+        db = SessionLocal()
+        try:
+            # Only re-read cameras when their configuration has changed
+            version = read_version(db)
+            if version == self._config_version:
+                return
+            cameras = db.query(models.Camera).filter(models.Camera.status == "active").all()
+            wanted = {}
+            for camera in cameras:
+                budget_mb = CLIP_BUFFER_DEFAULT_MB if camera.clip_buffer_mb is None else camera.clip_buffer_mb
+                if camera.rtsp_url and budget_mb > 0:
+                    wanted[camera.id] = (camera.rtsp_url, int(budget_mb * MB))
+        finally:
+            db.close()
+
+        stopped = []
+        with self._lock:
+            for camera_id, recorder in list(self.recorders.items()):
+                if wanted.get(camera_id, (None, None)) != (recorder.url, recorder.buffer.limit):
+                    recorder.stop()
+                    stopped.append(self.recorders.pop(camera_id))
+            for camera_id, (url, limit) in wanted.items():
+                if camera_id not in self.recorders:
+                    recorder = CameraRecorder(camera_id, url, PacketRingBuffer(limit, self.budget))
+                    self.recorders[camera_id] = recorder
+                    recorder.start()
+        for recorder in stopped:
+            recorder.join()
+        self._config_version = version
+
+    def _poll_alerts(self) -> None:
+        """Cut clips for alerts stored since the last poll."""
+        db = SessionLocal()
+        try:
+            if self._last_alert_id is None:
+                # Alerts from before this worker started recording have no footage
+                self._last_alert_id = db.query(models.Alert.id).order_by(models.Alert.id.desc()).limit(1).scalar() or 0
+                return
+            low = self._last_alert_id - ALERT_ID_OVERLAP
+            alerts = (
+                db.query(models.Alert.id, models.Alert.camera_id, models.Alert.created_at)
+                .filter(models.Alert.id > low)
+                .order_by(models.Alert.id)
+                .all()
+            )
+        finally:
+            db.close()
+
+        self._seen_alert_ids = {id for id in self._seen_alert_ids if id > low}
+        for alert_id, camera_id, created_at in alerts:
+            if alert_id in self._seen_alert_ids:
+                continue
+            self._seen_alert_ids.add(alert_id)
+            self._last_alert_id = max(self._last_alert_id, alert_id)
+            self.trigger(alert_id, camera_id, created_at)
+
+    def trigger(
+        self,
+        alert_id: int,
+        camera_id: int,
+        observed_at: datetime,
+        pre_seconds: float = CLIP_PRE_SECONDS,
+        post_seconds: float = CLIP_POST_SECONDS,
+    ) -> Optional[str]:
+        """
+        Start a clip for ``camera_id`` around ``observed_at`` (naive UTC) and link it from
+        the alert once it is written. Returns the clip's file name relative to the clip
+        directory, or None if the camera is not recorded or the event is older than the
+        buffered packets, e.g. for an alert that was delivered late.
+        """
+        with self._lock:
+            recorder = self.recorders.get(camera_id)
+        if recorder is None:
+            return None
+
+        event_time = observed_at.replace(tzinfo=timezone.utc).timestamp()
+        oldest = recorder.buffer.oldest()
+        if oldest is None or event_time < oldest:
+            logger.info(f"No clip for alert {alert_id}: event at {event_time:.0f} is not buffered")
+            return None
+
+        os.makedirs(os.path.join(self.clip_dir, f"camera_{camera_id}"), exist_ok=True)
+        name = f"camera_{camera_id}/{datetime.utcfromtimestamp(event_time):%Y%m%d_%H%M%S_%f}.mp4"
+        clip = {
+            "file": name,
+            "format": "mp4",
+            "start": datetime.utcfromtimestamp(event_time - pre_seconds).isoformat(),
+            "end": datetime.utcfromtimestamp(event_time + post_seconds).isoformat(),
+        }
+
+        def on_done(written: bool) -> None:
+            if written:
+                self._link_clip(alert_id, clip)
+
+        recorder.request_clip(ClipRequest(
+            os.path.join(self.clip_dir, name), event_time - pre_seconds, event_time + post_seconds, on_done
+        ))
+        return name
+
+    def _link_clip(self, alert_id: int, clip: Dict) -> None:
+        db = SessionLocal()
+        try:
+            alert = crud.get_alert(db, alert_id=alert_id)
+            if alert is None:
+                logger.info(f"Alert {alert_id} was deleted before its clip was written")
+                return
+            crud.link_alert_clip(db, alert, clip)
+            logger.info(f"Wrote clip {clip['file']} for alert {alert_id}")
+        except Exception as e:
+            logger.error(f"Failed to link clip {clip['file']} to alert {alert_id}: {str(e)}")
+        finally:
+            db.close()
+
+    def resolve(self, name: Optional[str]) -> Optional[str]:
+        """
+        Absolute path of the clip ``name`` links to, relative to the clip directory.
+        Returns None for anything that would resolve outside of it.
+        """
+        if not isinstance(name, str) or not name:
+            return None
+        root = os.path.realpath(self.clip_dir)
+        path = os.path.realpath(os.path.join(root, name))
+        if not path.startswith(root + os.sep):
+            return None
+        return path
+
+
+def remove_expired_clips(clip_dir: str = CLIP_DIR, retention_days: float = CLIP_RETENTION_DAYS) -> int:
+    """
+    Delete clips last written more than ``retention_days`` ago, including unfinished ones.
+    Safe to run from several workers at once. Returns how many files were removed.
+    """
+    if not os.path.isdir(clip_dir):
+        return 0
+    cutoff = time.time() - retention_days * 24 * 3600
+    removed = 0
+    for dirpath, _, filenames in os.walk(clip_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                # Removed by another worker
+                continue
+    return removed
+
+
+clip_recorder = ClipRecorderManager()
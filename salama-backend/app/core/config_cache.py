@@ -0,0 +1,167 @@
+import json
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from .. import models
+
+CAMERAS = "cameras"
+DETECTION_ZONES = "detection_zones"
+
+CONFIG_MODELS = {
+    CAMERAS: models.Camera,
+    DETECTION_ZONES: models.DetectionZone,
+}
+
+
+def serialize(obj: Any) -> Dict[str, Any]:
+    """Plain JSON-ready dict of a model's columns."""
+    return jsonable_encoder({c.name: getattr(obj, c.name) for c in obj.__table__.columns})
+
+
+CONFIG_VERSION_ID = 1
+# Rendered list pages kept per version; the oldest is dropped first
+RENDERED_PAGES_MAX = 16
+
+
+def read_version(db: Session) -> int:
+    """Current configuration version as stored in the database."""
+    version = db.query(models.ConfigVersion.version).filter(models.ConfigVersion.id == CONFIG_VERSION_ID).scalar()
+    return version or 0
+
+
+def bump_version(db: Session) -> int:
+    """
+    Increment the configuration version inside the caller's transaction and return it.
+    The caller commits, so the new version becomes visible together with the change.
+    """
+    bumped = (
+        db.query(models.ConfigVersion)
+        .filter(models.ConfigVersion.id == CONFIG_VERSION_ID)
+        .update({models.ConfigVersion.version: models.ConfigVersion.version + 1}, synchronize_session=False)
+    )
+    if not bumped:
+        db.add(models.ConfigVersion(id=CONFIG_VERSION_ID, version=int(time.time() * 1000)))
+        db.flush()
+    return read_version(db)
+
+
+class ConfigCache:
+    """
+    In-process cache of camera and detection zone configuration.
+
+    The version lives in the ``config_version`` row, which every write bumps in the
+    same transaction (see ``bump_version``), so all workers agree on it. Each read
+    compares the cached version with that row, a primary key lookup, and reloads
+    when another worker has written since.
+
+    Each entry remembers the version it last changed at. Writes made by this worker
+    are applied incrementally, which makes it cheap to answer "what changed since
+    version N"; versions from before the last reload are answered with a full snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.base_version = 0
+        self.version = 0
+        self._loaded = False
+        self._items: Dict[str, Dict[int, Tuple[int, Dict[str, Any]]]] = {kind: {} for kind in CONFIG_MODELS}
+        self._removed: Dict[str, Dict[int, int]] = {kind: {} for kind in CONFIG_MODELS}
+        self._rendered: Dict[Tuple, bytes] = {}
+
+    def _ensure_loaded(self, db: Session) -> None:
+        # Read the version first: a write committed while loading then triggers another reload
+        version = read_version(db)
+        if self._loaded and version == self.version:
+            return
+        self.base_version = self.version = version
+        self._rendered.clear()
+        for kind, model in CONFIG_MODELS.items():
+            self._items[kind] = {
+                obj.id: (version, serialize(obj)) for obj in db.query(model).order_by(model.id).all()
+            }
+            self._removed[kind].clear()
+        self._loaded = True
+
+    def _advance(self, version: int) -> bool:
+        """Move to ``version``; returns False, and forces a reload, if another worker wrote in between."""
+        if not self._loaded or version != self.version + 1:
+            self._loaded = False
+            return False
+        self.version = version
+        self._rendered.clear()
+        return True
+
+    def mark_changed(self, kind: str, obj: Any, version: int) -> None:
+        """Record a committed write of ``obj`` made at ``version``."""
+        with self._lock:
+            if self._advance(version):
+                self._items[kind][obj.id] = (version, serialize(obj))
+                self._removed[kind].pop(obj.id, None)
+
+    def mark_removed(self, kind: str, id: int, version: int) -> None:
+        with self._lock:
+            if self._advance(version):
+                self._items[kind].pop(id, None)
+                self._removed[kind][id] = version
+
+    def invalidate(self) -> None:
+        """Drop everything; the next read reloads from the database."""
+        with self._lock:
+            self._loaded = False
+
+    def render_list(self, db: Session, kind: str, skip: int = 0, limit: int = 100) -> Tuple[str, bytes]:
+        """ETag and JSON body of a page of ``kind``, rendered at most once per version."""
+        with self._lock:
+            self._ensure_loaded(db)
+            key = (kind, skip, limit)
+            body = self._rendered.get(key)
+            if body is None:
+                items = self._items[kind]
+                page = [items[id][1] for id in sorted(items)[skip:skip + limit]]
+                body = json.dumps(page, separators=(",", ":")).encode()
+                # Pages are keyed by client-chosen skip/limit, so keep only a few
+                if len(self._rendered) >= RENDERED_PAGES_MAX:
+                    self._rendered.pop(next(iter(self._rendered)))
+                self._rendered[key] = body
+            return f'"{self.version}-{skip}-{limit}"', body
+
+    def changes(self, db: Session, since_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Cameras and zones changed after ``since_version``, plus the ids of removed ones.
+        A full snapshot is returned when ``since_version`` is missing, predates the
+        last reload, or is not a version this database has reached.
+        """
+        with self._lock:
+            self._ensure_loaded(db)
+            full = (
+                since_version is None
+                or since_version < self.base_version
+                or since_version > self.version
+            )
+            result = {"version": self.version, "full": full}
+            for kind in CONFIG_MODELS:
+                items = self._items[kind]
+                result[kind] = [
+                    data for id, (version, data) in sorted(items.items())
+                    if full or version > since_version
+                ]
+                result[f"removed_{kind}"] = [] if full else sorted(
+                    id for id, version in self._removed[kind].items() if version > since_version
+                )
+            return result
+
+
+def etag_response(etag: str, body: bytes, if_none_match: Optional[str]) -> Response:
+    """Cached JSON body, or an empty 304 when the client already has this version."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+config_cache = ConfigCache()
@@ -0,0 +1,112 @@
+import logging
+import os
+import tempfile
+import threading
+import zlib
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from ..database import engine
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """
+    Cross-process lock that elects the one worker running the background jobs.
+
+    On PostgreSQL this is a session-level advisory lock held on a dedicated
+    connection. Elsewhere it is an exclusive ``flock`` on a file next to the
+    database, so it only covers workers on the same host. Once acquired the lock
+    is kept until ``release``, and the worker stays leader until it exits.
+    """
+
+    def __init__(self, engine: Engine, name: str):
+        self.engine = engine
+        self.name = name
+        self._lock = threading.Lock()
+        self._conn = None
+        self._file = None
+
+    def _lock_path(self) -> str:
+        database = self.engine.url.database
+        if self.engine.dialect.name == "sqlite" and database and database != ":memory:":
+            return f"{os.path.abspath(database)}.{self.name}.lock"
+        return os.path.join(tempfile.gettempdir(), f"{self.name}.lock")
+
+    def _still_held(self) -> bool:
+        if self._file is not None:
+            return True
+        if self._conn is None:
+            return False
+        try:
+            self._conn.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            # The advisory lock went away with the connection
+            logger.warning(f"Lost leader lock {self.name}: {str(e)}")
+            self._conn.invalidate()
+            self._conn.close()
+            self._conn = None
+            return False
+
+    def _acquire_advisory(self) -> bool:
+        conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"),
+                {"key": zlib.crc32(self.name.encode())},
+            ).scalar()
+        except Exception:
+            conn.close()
+            raise
+        if acquired:
+            self._conn = conn
+        else:
+            conn.close()
+        return bool(acquired)
+
+    def _acquire_file(self) -> bool:
+        import fcntl
+
+        f = open(self._lock_path(), "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    def acquire(self) -> bool:
+        """Try to become leader without blocking; returns whether this process is the leader."""
+        with self._lock:
+            if self._still_held():
+                return True
+            if self.engine.dialect.name == "postgresql":
+                acquired = self._acquire_advisory()
+            else:
+                acquired = self._acquire_file()
+            if acquired:
+                logger.info(f"Acquired leader lock {self.name} in process {os.getpid()}")
+            return acquired
+
+    def release(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        text("SELECT pg_advisory_unlock(:key)"),
+                        {"key": zlib.crc32(self.name.encode())},
+                    )
+                finally:
+                    self._conn.close()
+                    self._conn = None
+            if self._file is not None:
+                # Closing the file drops the flock
+                self._file.close()
+                self._file = None
+
+
+background_leader = LeaderLock(engine, "salama-background-jobs")
@@ -1,8 +1,10 @@
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from . import models, schemas
+from .core.config_cache import bump_version, config_cache, CAMERAS, DETECTION_ZONES
 import logging
 
 ModelType = TypeVar("ModelType", bound=Any)
@@ -54,18 +56,71 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.commit()
         return obj
 
-class CRUDCamera(CRUDBase[models.Camera, schemas.CameraCreate, schemas.CameraCreate]):
+class CRUDConfig(CRUDBase[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    CRUD object for configuration read by the detectors.
+    Every write bumps the shared config version in its own transaction and updates the config cache.
+    """
+    def __init__(self, model: Type[ModelType], cache_kind: str):
+        super().__init__(model)
+        self.cache_kind = cache_kind
+
+    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        version = bump_version(db)
+        db.commit()
+        db.refresh(db_obj)
+        config_cache.mark_changed(self.cache_kind, db_obj, version)
+        return db_obj
+
+    def update(self, db: Session, *, db_obj: ModelType, obj_in: Union[UpdateSchemaType, Dict[str, Any]]) -> ModelType:
+        obj_data = jsonable_encoder(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+        version = bump_version(db)
+        db.commit()
+        db.refresh(db_obj)
+        config_cache.mark_changed(self.cache_kind, db_obj, version)
+        return db_obj
+
+    def remove(self, db: Session, *, id: int) -> ModelType:
+        obj = db.query(self.model).get(id)
+        db.delete(obj)
+        version = bump_version(db)
+        db.commit()
+        config_cache.mark_removed(self.cache_kind, id, version)
+        return obj
+
+class CRUDCamera(CRUDConfig[models.Camera, schemas.CameraCreate, schemas.CameraCreate]):
     pass
 
 class CRUDAlert(CRUDBase[models.Alert, schemas.AlertCreate, schemas.AlertCreate]):
-    pass
+    def create(self, db: Session, *, obj_in: schemas.AlertCreate) -> models.Alert:
+        # created_at stays a datetime so the day bucket can be derived from it
+        obj_in_data = jsonable_encoder(obj_in, exclude={"created_at"})
+        db_obj = self.model(**obj_in_data, created_at=obj_in.created_at)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def get_by_event_id(self, db: Session, event_id: Any) -> Optional[models.Alert]:
+        return db.query(self.model).filter(self.model.event_id == str(event_id)).first()
 
-class CRUDDetectionZone(CRUDBase[models.DetectionZone, schemas.DetectionZoneCreate, schemas.DetectionZoneCreate]):
+class CRUDDetectionZone(CRUDConfig[models.DetectionZone, schemas.DetectionZoneCreate, schemas.DetectionZoneCreate]):
     pass
 
-camera = CRUDCamera(models.Camera)
+camera = CRUDCamera(models.Camera, CAMERAS)
 alert_crud = CRUDAlert(models.Alert)
-detection_zone = CRUDDetectionZone(models.DetectionZone)
+detection_zone = CRUDDetectionZone(models.DetectionZone, DETECTION_ZONES)
 
 # Module-level functions to match the existing interface in alerts.py
 def get_alerts(db: Session, skip: int = 0, limit: int = 100) -> List[models.Alert]:
@@ -74,6 +129,9 @@ def get_alerts(db: Session, skip: int = 0, limit: int = 100) -> List[models.Aler
 def get_alert(db: Session, alert_id: int) -> Optional[models.Alert]:
     return alert_crud.get(db, id=alert_id)
 
+def get_alert_by_event_id(db: Session, event_id: Any) -> Optional[models.Alert]:
+    return alert_crud.get_by_event_id(db, event_id=event_id)
+
 def create_alert(db: Session, alert: schemas.AlertCreate) -> models.Alert:
     try:
         # Explicit validation for camera_id
@@ -94,8 +152,23 @@ def create_alert(db: Session, alert: schemas.AlertCreate) -> models.Alert:
             logger.error(f"Attempted to create alert for non-existent camera ID: {alert.camera_id}")
             raise ValueError(f"Camera with ID {alert.camera_id} does not exist")
         
+        # A redelivered alert returns the one already stored
+        if alert.event_id is not None:
+            existing_alert = alert_crud.get_by_event_id(db, event_id=alert.event_id)
+            if existing_alert:
+                logger.info(f"Alert for event {alert.event_id} already exists: {existing_alert}")
+                return existing_alert
+
         # Create the alert using the alert_crud object
-        new_alert = alert_crud.create(db, obj_in=alert)
+        try:
+            new_alert = alert_crud.create(db, obj_in=alert)
+        except IntegrityError:
+            # The same event was stored concurrently
+            db.rollback()
+            existing_alert = alert_crud.get_by_event_id(db, event_id=alert.event_id) if alert.event_id else None
+            if existing_alert is None:
+                raise
+            return existing_alert
         
         logger.info(f"Alert created successfully: {new_alert}")
         return new_alert
@@ -103,5 +176,27 @@ def create_alert(db: Session, alert: schemas.AlertCreate) -> models.Alert:
         logger.error(f"Error creating alert: {str(e)}")
         raise
 
+def link_alert_clip(db: Session, alert: models.Alert, clip: Dict[str, Any]) -> models.Alert:
+    return alert_crud.update(
+        db, db_obj=alert, obj_in={"additional_metadata": {**(alert.additional_metadata or {}), "clip": clip}}
+    )
+
 def delete_alert(db: Session, alert_id: int) -> models.Alert:
     return alert_crud.remove(db, id=alert_id)
+
+# Module-level functions to match the existing interface in detection_zones.py
+def get_zones(db: Session, skip: int = 0, limit: int = 100) -> List[models.DetectionZone]:
+    return detection_zone.get_multi(db, skip=skip, limit=limit)
+
+def get_zone(db: Session, zone_id: int) -> Optional[models.DetectionZone]:
+    return detection_zone.get(db, id=zone_id)
+
+def create_zone(db: Session, zone: schemas.DetectionZoneCreate) -> models.DetectionZone:
+    return detection_zone.create(db, obj_in=zone)
+
+def update_zone(db: Session, zone_id: int, zone: schemas.DetectionZoneCreate) -> models.DetectionZone:
+    db_zone = detection_zone.get(db, id=zone_id)
+    return detection_zone.update(db, db_obj=db_zone, obj_in=zone)
+
+def delete_zone(db: Session, zone_id: int) -> models.DetectionZone:
+    return detection_zone.remove(db, id=zone_id)
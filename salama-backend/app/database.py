@@ -10,7 +10,11 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./salama.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(DATABASE_URL)
+# SQLite connections are used from more than one thread: streamed responses, such as
+# the alert export, are advanced on whichever thread pool worker is free
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+
+engine = create_engine(DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -1,17 +1,87 @@
+import asyncio
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+
+# Load environment variables before any module reads its configuration
+load_dotenv()
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from .api.v1.api import api_router
-from . import models
 from .database import engine
+from .core import alert_retention
+from .core.leader import background_leader
+from .core.camera_health import camera_health_monitor
+from .core.clip_recorder import clip_recorder, remove_expired_clips, CLIP_RECORDING_ENABLED
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+ALERT_RETENTION_INTERVAL_SECONDS = int(os.getenv("ALERT_RETENTION_INTERVAL_SECONDS", "3600"))
+# Turns off retention, health probes and clip recording, e.g. for benchmarks and one-off tools
+BACKGROUND_JOBS_ENABLED = os.getenv("SALAMA_BACKGROUND_JOBS", "true").lower() == "true"
+
+# Held while retention runs, so the leader lock is not given up halfway through a run
+_retention_lock = threading.Lock()
+
+def run_alert_retention() -> None:
+    """Create upcoming alert partitions and retire expired ones, if this worker is the leader."""
+    with _retention_lock:
+        if background_leader.acquire():
+            alert_retention.ensure_partitions(engine)
+            alert_retention.run_retention(engine)
+
+def release_leader() -> None:
+    with _retention_lock:
+        background_leader.release()
+
+async def alert_retention_loop():
+    """
+    Keep alert partitions created ahead of time and retire expired ones.
+    Only the worker holding the leader lock does the work, so workers never retire the same day twice.
+    Expired clips are removed by every worker, since the recording leader may have moved between hosts.
+    """
+    while True:
+        try:
+            await run_in_threadpool(run_alert_retention)
+        except Exception as e:
+            logger.error(f"Alert retention job failed: {str(e)}")
+        try:
+            removed = await run_in_threadpool(remove_expired_clips)
+            if removed:
+                logger.info(f"Removed {removed} expired clips")
+        except Exception as e:
+            logger.error(f"Clip retention failed: {str(e)}")
+        await asyncio.sleep(ALERT_RETENTION_INTERVAL_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start and stop the background jobs, unless SALAMA_BACKGROUND_JOBS is false.
+    The database schema is managed by Alembic (`alembic upgrade head`), not at startup.
+    """
+    if not BACKGROUND_JOBS_ENABLED:
+        logger.info("Background jobs are disabled")
+        yield
+        return
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+    alert_retention_task = asyncio.create_task(alert_retention_loop())
+    camera_health_monitor.start()
+    if CLIP_RECORDING_ENABLED:
+        clip_recorder.start()
+    try:
+        yield
+    finally:
+        if CLIP_RECORDING_ENABLED:
+            await run_in_threadpool(clip_recorder.stop)
+        await run_in_threadpool(camera_health_monitor.stop)
+        alert_retention_task.cancel()
+        await run_in_threadpool(release_leader)
 
-app = FastAPI(title="SALAMA Backend")
+app = FastAPI(title="SALAMA Backend", lifespan=lifespan)
 
 # Configure CORS
 origins = [
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, CheckConstraint
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, JSON, CheckConstraint, Boolean, Float, Index, event
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -18,6 +18,8 @@ class Camera(Base):
     location = Column(String)
     status = Column(String)
     rtsp_url = Column(String)
+    substream_url = Column(String, nullable=True)  # Lower-resolution stream used for detection
+    clip_buffer_mb = Column(Float, nullable=True)  # Memory for pre-event frames; 0 disables clips
 
     alerts = relationship("Alert", back_populates="camera")
     detection_zones = relationship("DetectionZone", back_populates="camera")
@@ -33,19 +35,38 @@ class Alert(Base):
     )
     message = Column(String)
     severity = Column(String)  # Keep existing severity
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # Day bucket (YYYYMMDD) used for retention on databases without native partitioning
+    bucket = Column(Integer, nullable=False, index=True)
     
     # New detailed fields
     detection_zone = Column(String, nullable=True)  # Specific zone where alert occurred
     object_detected = Column(String, nullable=True)  # Type of object detected
     confidence_score = Column(String, nullable=True)  # Confidence of detection
     additional_metadata = Column(JSON, nullable=True)  # Flexible JSON for extra context
+    # Client-generated id of the detection, so a redelivered alert is stored once
+    event_id = Column(String(36), nullable=True)
 
     camera = relationship("Camera", back_populates="alerts")
 
+    # Unique indexes on a partitioned table must include the partition key
+    __table_args__ = (
+        Index("ux_alerts_event_id", "event_id", "created_at", unique=True),
+    )
+
     def __repr__(self):
         return f"&lt;Alert {self.id}: {self.type} at {self.created_at}&gt;"
 
+def alert_bucket(ts: datetime) -> int:
+    """Return the day bucket (YYYYMMDD) an alert created at ``ts`` belongs to."""
+    return ts.year * 10000 + ts.month * 100 + ts.day
+
+@event.listens_for(Alert, "before_insert")
+def _stamp_alert_bucket(mapper, connection, target):
+    if target.created_at is None:
+        target.created_at = datetime.utcnow()
+    target.bucket = alert_bucket(target.created_at)
+
 class DetectionZone(Base):
     __tablename__ = "detection_zones"
     
@@ -55,3 +76,23 @@ class DetectionZone(Base):
     coordinates = Column(JSON)
 
     camera = relationship("Camera", back_populates="detection_zones")
+
+class CameraHealth(Base):
+    __tablename__ = "camera_health"
+
+    camera_id = Column(Integer, ForeignKey("cameras.id", ondelete="CASCADE"), primary_key=True)
+    online = Column(Boolean, nullable=False)
+    consecutive_failures = Column(Integer, nullable=False, default=0)
+    latency_ms = Column(Float, nullable=True)  # Time to connect and grab the first frame
+    fps = Column(Float, nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    last_error = Column(String, nullable=True)
+    checked_at = Column(DateTime, nullable=False)
+
+class ConfigVersion(Base):
+    """Single row holding the version of the camera and zone configuration, shared by all workers."""
+    __tablename__ = "config_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False)
@@ -1,6 +1,7 @@
-from typing import Optional, Dict
-from datetime import datetime
-from pydantic import BaseModel
+from typing import Optional, Dict, List
+from datetime import datetime, timezone
+from uuid import UUID
+from pydantic import BaseModel, field_validator
 from enum import Enum
 
 # Alert Type Enum to match the model
@@ -11,11 +12,29 @@ class AlertType(str, Enum):
     CAMERA_OFFLINE = "camera_offline"
     SYSTEM_ERROR = "system_error"
 
+# Alert export options
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    ARROW = "arrow"
+
+class ExportCompression(str, Enum):
+    NONE = "none"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+# Which camera stream a frame is taken from
+class StreamPurpose(str, Enum):
+    DETECTION = "detection"
+    EVIDENCE = "evidence"
+
 # Camera schemas
 class CameraBase(BaseModel):
     name: str
     location: str
     rtsp_url: str
+    substream_url: Optional[str] = None  # Lower-resolution stream used for detection
+    clip_buffer_mb: Optional[float] = None  # Memory for pre-event frames; 0 disables clips
     status: str = "active"
 
 class CameraCreate(CameraBase):
@@ -41,10 +60,22 @@ class AlertBase(BaseModel):
     additional_metadata: Optional[Dict] = None
 
 class AlertCreate(AlertBase):
-    pass
+    # Client-generated id of the detection; a redelivered alert with the same id is stored once
+    event_id: Optional[UUID] = None
+    # When the event was observed; defaults to when the backend receives the alert
+    created_at: Optional[datetime] = None
+
+    @field_validator("created_at")
+    @classmethod
+    def to_naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Alerts are stored in naive UTC
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
 
 class Alert(AlertBase):
     id: int
+    event_id: Optional[UUID] = None
     created_at: datetime
 
     class Config:
@@ -64,3 +95,27 @@ class DetectionZone(DetectionZoneBase):
 
     class Config:
         from_attributes = True
+
+# Camera health schemas
+class CameraHealth(BaseModel):
+    camera_id: int
+    online: bool
+    consecutive_failures: int
+    latency_ms: Optional[float] = None
+    fps: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    last_error: Optional[str] = None
+    checked_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# Config schemas
+class ConfigChanges(BaseModel):
+    version: int
+    full: bool
+    cameras: List[Camera]
+    detection_zones: List[DetectionZone]
+    removed_cameras: List[int]
+    removed_detection_zones: List[int]
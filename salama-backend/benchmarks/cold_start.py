@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Measure the cold start of a backend worker.
+
+Each run starts a fresh interpreter, imports `app.main` and runs the application
+lifespan up to the point where it would accept requests. Workers run against a
+throwaway SQLite database with background jobs disabled, so the benchmark never
+touches the database configured in `.env` and no probe threads outlive a run.
+Run from the salama-backend directory:
+
+    python benchmarks/cold_start.py --runs 10 --output benchmarks/cold_start.jsonl
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def start():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+print(json.dumps({
+    "import_s": imported - started,
+    "startup_s": ready - imported,
+    "modules": len(sys.modules),
+    "cv2_loaded": "cv2" in sys.modules,
+}))
+"""
+
+
+def run_worker(database_url):
+    # Set explicitly: load_dotenv() does not override variables that are already set
+    env = dict(os.environ, DATABASE_URL=database_url, SALAMA_BACKGROUND_JOBS="false")
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["process_s"] = time.perf_counter() - started
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to measure")
+    parser.add_argument("--output", help="append the summary as a JSON line to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'cold_start.db')}"
+        samples = [run_worker(database_url) for _ in range(args.runs)]
+
+    summary = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "cv2_loaded": any(s["cv2_loaded"] for s in samples),
+        "modules": samples[-1]["modules"],
+    }
+    for key in ("import_s", "startup_s", "process_s"):
+        values = [s[key] for s in samples]
+        summary[key] = {
+            "median": statistics.median(values),
+            "min": min(values),
+            "max": max(values),
+        }
+        print(f"{key:<10} median {summary[key]['median'] * 1000:8.1f} ms   "
+              f"min {summary[key]['min'] * 1000:8.1f} ms   max {summary[key]['max'] * 1000:8.1f} ms")
+    print(f"modules loaded: {summary['modules']}, cv2 loaded at startup: {summary['cv2_loaded']}")
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()